@@ -1,27 +1,96 @@
 import asyncio
-import json
+import atexit
+import base64
+import functools
 import os
+import re
 import threading
 import time
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
 import httpx
-import yaml
-from authlib.jose import JsonWebKey, jwt
-from rich.console import Console
-from rich.live import Live
-from rich.markdown import Markdown
+import orjson
+from rich.console import Console, Group
 from rich.prompt import Prompt
+from rich.segment import Segment
+from rich.text import Text
+
+# cryptography, yaml, and rich's Markdown/Live (which pull in OpenSSL bindings,
+# PyYAML, markdown-it and Pygments) are imported where they are used, so a
+# launch that reuses the cached token reaches the prompt without loading them.
 
 console = Console()
 API_URL = "https://chat.ezevals.com:54269"
 # API_URL = "http://10.224.174.3:34199"
 # API_URL = "http://localhost:8080"
+CONFIG_DIR = (
+    Path(os.environ.get("XDG_CONFIG_HOME", "~/.config")).expanduser() / "karllm"
+)
 ALGORITHM = "EdDSA"
+# Tokens are signed with the key directly; the JOSE header never changes.
+_JWT_HEADER = base64.urlsafe_b64encode(
+    orjson.dumps({"alg": ALGORITHM, "typ": "JWT"})
+).rstrip(b"=")
+JWT_TTL = timedelta(hours=10)
+JWT_REFRESH_MARGIN = 300  # re-sign when fewer seconds than this remain
+JWT_CACHE_PATH = (
+    Path(os.environ.get("XDG_CACHE_HOME", "~/.cache")).expanduser()
+    / "karllm"
+    / "jwt.json"
+)
 SESSION_ID = None
-last_interaction = time.time()
+# Sent as default headers on both shared clients; on HTTP/2 the token is
+# indexed by HPACK after the first request.
+SESSION_HEADERS = {}
+last_interaction = time.monotonic()
+KEEPALIVE_IDLE = 60 * 5  # ping after this many idle seconds
+KEEPALIVE_RETRY = 30
 client_config = None
+_jwt_token = None
+_jwt_exp = 0
+_jwt_from_cache = False
+RENDER_INTERVAL = 0.05  # seconds between Live redraws while streaming
+# SSE framing sentinels, encoded once.
+_EVENT_END = b"\n\n"
+_EVENT_END_LEN = len(_EVENT_END)
+_DATA = b"data:"
+_DATA_LEN = len(_DATA)
+_DONE = "[DONE]"
+_bad_frame_reported = False
+
+
+def note_interaction(response=None):
+    """Record server activity; any response keeps the session alive."""
+    global last_interaction
+    last_interaction = time.monotonic()
+
+
+async def anote_interaction(response):
+    note_interaction(response)
+
+
+# Shared clients so every request reuses pooled TCP/TLS connections instead of
+# paying a fresh handshake per call. HTTP/2 is negotiated via ALPN and falls back
+# to HTTP/1.1 when the server does not offer it. A CLI has little concurrency,
+# so only a couple of idle connections are kept, for up to ten minutes.
+HTTP_LIMITS = httpx.Limits(
+    max_connections=64, max_keepalive_connections=2, keepalive_expiry=600.0
+)
+# Uploads and /read can keep the server busy, so only reads are unbounded.
+_SYNC = httpx.Client(
+    base_url=API_URL,
+    timeout=httpx.Timeout(10.0, read=None),
+    http2=True,
+    limits=HTTP_LIMITS,
+    event_hooks={"response": [note_interaction]},
+)
+atexit.register(_SYNC.close)
+_ASYNC = None
+
+# GET endpoints whose response is fixed for the lifetime of a session.
+CACHED_GET_COMMANDS = frozenset({"/filetypes"})
+_get_cache = {}
 
 
 def handle_upload(path, newname=None):
@@ -31,13 +100,11 @@ def handle_upload(path, newname=None):
         return
 
     with open(file_path, "rb") as f:
+        # Pass the open handle so httpx streams the multipart body from disk
+        # (Content-Length comes from the file size) instead of buffering it.
         files = {"file": (file_path.name, f)}
         data = {"newfilename": newname} if newname else {}
-        headers = get_auth_headers()
-
-        response = httpx.post(
-            f"{API_URL}/upload", files=files, data=data, headers=headers
-        )
+        response = _SYNC.post("/upload", files=files, data=data)
         if response.status_code == 200:
             console.print(f"[green]\u2714 {response.json()['message']}[/green]")
         else:
@@ -45,111 +112,308 @@ def handle_upload(path, newname=None):
 
 
 def handle_read(filename):
-    headers = get_auth_headers()
-    response = httpx.post(
-        f"{API_URL}/read", json={"filename": filename}, headers=headers
-    )
+    response = _SYNC.post("/read", json={"filename": filename})
     if response.status_code == 200:
         console.print(f"[green]\u2714 {response.json()['message']}[/green]")
     else:
         console.print(f"[red]\u2718 Read failed: {response.text}[/red]")
 
 
-def load_jwt_token():
-    global client_config
-    config_path = (
-        Path(os.environ.get("XDG_CONFIG_HOME", "~/.config")).expanduser()
-        / "karllm"
-        / "karllm.conf"
-    )
-    if not config_path.exists():
+# PyYAML resolves these words only in lower, Title or UPPER case; any other
+# casing stays a string.
+_YAML_SCALARS = {
+    spelling: value
+    for word, value in {
+        "true": True,
+        "yes": True,
+        "on": True,
+        "false": False,
+        "no": False,
+        "off": False,
+        "null": None,
+        "~": None,
+    }.items()
+    for spelling in (word, word.title(), word.upper())
+}
+_YAML_INT = re.compile(r"0|[1-9][0-9]*")
+
+
+def parse_flat_yaml(text: str):
+    """Parse a flat ``key: value`` YAML mapping without importing PyYAML.
+
+    Returns None for anything beyond plain top-level scalars (nesting, lists,
+    flow or block syntax, inline comments, escapes, non-decimal numbers) so
+    the caller can fall back to ``yaml.safe_load``.
+    """
+    config = {}
+    for raw in text.splitlines():
+        line = raw.strip()
+        if not line or line.startswith("#") or line == "---":
+            continue
+        key, sep, value = line.partition(":")
+        key, value = key.strip(), value.strip()
+        if raw[0].isspace() or not sep or not value:
+            return None
+        if not key.isidentifier() or key in _YAML_SCALARS:
+            return None
+        if " #" in value or ": " in value or value.endswith(":"):
+            return None
+        if value[0] in "'\"":
+            if len(value) < 2 or value[-1] != value[0]:
+                return None
+            value = value[1:-1]
+            if "'" in value or '"' in value or "\\" in value:
+                return None
+        elif value in _YAML_SCALARS:
+            value = _YAML_SCALARS[value]
+        elif _YAML_INT.fullmatch(value):
+            value = int(value)
+        elif value[0] in "0123456789+-.[]{}|>&*!%@`,?":
+            return None
+        config[key] = value
+    return config
+
+
+@functools.lru_cache(maxsize=1)
+def load_client_config():
+    """Load karllm.json if present (fast path), otherwise the YAML karllm.conf."""
+    json_path = CONFIG_DIR / "karllm.json"
+    config_path = CONFIG_DIR / "karllm.conf"
+    if json_path.exists():
+        config = orjson.loads(json_path.read_bytes())
+    elif config_path.exists():
+        text = config_path.read_text()
+        config = parse_flat_yaml(text)
+        if config is None:
+            import yaml
+
+            config = yaml.safe_load(text)
+    else:
         raise RuntimeError(f"Missing client config at {config_path}")
 
-    with open(config_path, "r") as f:
-        client_config = yaml.safe_load(f)
-
-    username = client_config.get("username")
-    private_key_path = client_config.get("secret")
-
-    if not username or not private_key_path:
+    if not config.get("username") or not config.get("secret"):
         raise RuntimeError("Config must include 'username' and 'secret' fields")
+    return config
+
 
-    private_key_path = Path(private_key_path).expanduser()
-    if not private_key_path.exists():
+def load_signing_key(private_key_path: Path):
+    """Return the Ed25519 key, re-importing it only if the file changed."""
+    try:
+        mtime = private_key_path.stat().st_mtime
+    except FileNotFoundError:
         raise RuntimeError(f"Private key file not found: {private_key_path}")
+    return _load_signing_key(private_key_path, mtime)
 
-    with open(private_key_path, "r") as f:
-        jwk = JsonWebKey.import_key(f.read(), {"kty": "OKP"})
-    header = {"alg": ALGORITHM}
 
-    payload = {
-        "sub": username,
-        "exp": int((datetime.now(timezone.utc) + timedelta(hours=10)).timestamp()),
-    }
+@functools.lru_cache(maxsize=4)
+def _load_signing_key(private_key_path: Path, mtime: float):
+    from cryptography.hazmat.primitives.asymmetric.ed25519 import (
+        Ed25519PrivateKey,
+    )
+    from cryptography.hazmat.primitives.serialization import load_pem_private_key
+
+    data = private_key_path.read_bytes()
+    if data.lstrip().startswith(b"{"):
+        # An OKP JWK; the private scalar is the base64url "d" member.
+        d = orjson.loads(data)["d"]
+        return Ed25519PrivateKey.from_private_bytes(
+            base64.urlsafe_b64decode(d + "=" * (-len(d) % 4))
+        )
+    key = load_pem_private_key(data, password=None)
+    if not isinstance(key, Ed25519PrivateKey):
+        raise RuntimeError(f"Private key is not an Ed25519 key: {private_key_path}")
+    return key
+
+
+def _b64url(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
 
-    return jwt.encode(header, payload, jwk).decode("utf-8")
+def _mint_jwt(key, username: str):
+    """Sign a fresh token and return it with its expiry as a Unix timestamp."""
+    exp = int((datetime.now(timezone.utc) + JWT_TTL).timestamp())
+    payload = {"sub": username, "exp": exp}
+    signing_input = _JWT_HEADER + b"." + _b64url(orjson.dumps(payload))
+    token = signing_input + b"." + _b64url(key.sign(signing_input))
+    return token.decode("ascii"), exp
 
 
-JWT_TOKEN = load_jwt_token()
+def _key_path():
+    return Path(client_config["secret"]).expanduser()
+
+
+def _read_cached_jwt(username: str):
+    """Return ``(token, exp)`` from the on-disk cache, or ``(None, 0)``.
+
+    The cached token is only reused if it was signed for this user with the
+    configured key file as it is now; replacing the key invalidates it.
+    """
+    try:
+        cached = orjson.loads(JWT_CACHE_PATH.read_bytes())
+        key_path = _key_path()
+        key_mtime = key_path.stat().st_mtime
+    except (OSError, orjson.JSONDecodeError):
+        return None, 0
+    if (
+        not isinstance(cached, dict)
+        or cached.get("sub") != username
+        or cached.get("key") != str(key_path)
+        or cached.get("key_mtime") != key_mtime
+    ):
+        return None, 0
+    return cached.get("token"), cached.get("exp", 0)
+
+
+def _mint_and_cache_jwt(username: str):
+    key_path = _key_path()
+    key = load_signing_key(key_path)
+    token, exp = _mint_jwt(key, username)
+    cached = {
+        "sub": username,
+        "key": str(key_path),
+        "key_mtime": key_path.stat().st_mtime,
+        "token": token,
+        "exp": exp,
+    }
+    try:
+        JWT_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(JWT_CACHE_PATH, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            os.fchmod(f.fileno(), 0o600)
+            f.write(orjson.dumps(cached))
+    except OSError as e:
+        console.print(f"[yellow]⚠ Could not cache token: {e}[/yellow]")
+    return token, exp
+
+
+def current_jwt():
+    """Return a valid JWT, reusing the disk cache across launches when possible."""
+    global _jwt_token, _jwt_exp, _jwt_from_cache
+    username = client_config["username"]
+    if _jwt_token is None:
+        _jwt_token, _jwt_exp = _read_cached_jwt(username)
+        _jwt_from_cache = _jwt_token is not None
+    if _jwt_token is None or time.time() > _jwt_exp - JWT_REFRESH_MARGIN:
+        _jwt_token, _jwt_exp = _mint_and_cache_jwt(username)
+        _jwt_from_cache = False
+    return _jwt_token
+
+
+def refresh_jwt():
+    """Discard the current token and sign a new one, replacing the disk cache."""
+    global _jwt_token, _jwt_exp, _jwt_from_cache
+    _jwt_token, _jwt_exp = _mint_and_cache_jwt(client_config["username"])
+    _jwt_from_cache = False
+    return _jwt_token
 
 
 def connect_and_get_session():
     """Establish a session with the server using JWT authentication."""
     global SESSION_ID
+    body = {"saveInteractions": client_config.get("saveInteractions", False)}
     try:
-        response = httpx.post(
-            f"{API_URL}/connect",
-            headers={"Authorization": f"Bearer {JWT_TOKEN}"},
-            json={"saveInteractions": client_config.get("saveInteractions", False)},
+        response = _SYNC.post(
+            "/connect",
+            headers={"Authorization": f"Bearer {current_jwt()}"},
+            json=body,
         )
+        if response.status_code == 401 and _jwt_from_cache:
+            # A token cached by an earlier launch can be rejected after the
+            # server's key changes; sign a fresh one and retry once.
+            response = _SYNC.post(
+                "/connect",
+                headers={"Authorization": f"Bearer {refresh_jwt()}"},
+                json=body,
+            )
         response.raise_for_status()
         SESSION_ID = response.json()["session_id"]
+        SESSION_HEADERS["X-Session-Token"] = SESSION_ID
+        _SYNC.headers.update(SESSION_HEADERS)
+        if _ASYNC is not None:
+            _ASYNC.headers.update(SESSION_HEADERS)
     except Exception as e:
         console.print(f"[red]✘ Auth failed: {e}[/red]")
         exit(1)
 
 
-def keep_alive():
-    """Send periodic keep-alive pings to prevent session expiry."""
-    global SESSION_ID, last_interaction
+async def keep_alive():
+    """Send periodic keep-alive pings to prevent session expiry.
+
+    The session lives in the server application, not the connection, and
+    httpx does not emit HTTP/2 PING frames on idle connections, so a
+    transport-level heartbeat cannot replace this request. The task only
+    wakes when a ping is actually due.
+    """
     while True:
-        time.sleep(30)
-        if SESSION_ID and ((time.time() - last_interaction) > (60 * 5)):
-            try:
-                httpx.post(
-                    f"{API_URL}/keepalive",
-                    headers={"X-Session-Token": SESSION_ID},
-                    timeout=5,
-                )
-                last_interaction = time.time()
-            except Exception as e:
-                console.print(f"[yellow]⚠ Keep-alive failed: {e}[/yellow]")
+        # Sleep until the session has actually been idle long enough instead
+        # of polling; any interaction in the meantime pushes the deadline out.
+        idle = time.monotonic() - last_interaction
+        if idle < KEEPALIVE_IDLE:
+            await asyncio.sleep(KEEPALIVE_IDLE - idle)
+            continue
+        try:
+            await get_async_client().post("/keepalive", timeout=5)
+        except Exception as e:
+            console.print(f"[yellow]⚠ Keep-alive failed: {e}[/yellow]")
+            await asyncio.sleep(KEEPALIVE_RETRY)
+
+
+def get_async_client():
+    """Return the shared AsyncClient, creating it on the REPL's event loop."""
+    global _ASYNC
+    if _ASYNC is None:
+        _ASYNC = httpx.AsyncClient(
+            base_url=API_URL,
+            timeout=None,
+            http2=True,
+            limits=HTTP_LIMITS,
+            headers=SESSION_HEADERS,
+            event_hooks={"response": [anote_interaction]},
+        )
+    return _ASYNC
+
+
+async def warm_up_async_client():
+    """Open the streaming connection ahead of the first prompt."""
+    try:
+        await get_async_client().head("/", timeout=5)
+    except Exception:
+        pass  # the first real request will simply pay the handshake
 
 
-connect_and_get_session()
-threading.Thread(target=keep_alive, daemon=True).start()
-AUTH_HEADERS = lambda: {"X-Session-Token": SESSION_ID}
+async def close_async_client():
+    global _ASYNC
+    if _ASYNC is not None:
+        await _ASYNC.aclose()
+        _ASYNC = None
 
 
-def get_auth_headers():
-    return {"X-Session-Token": SESSION_ID}
+def print_get_payload(parsed):
+    from rich.markdown import Markdown
+
+    # If /help returns a markdown table in 'help'
+    if isinstance(parsed, dict):
+        content = parsed.get("help")
+        if content is None:
+            content = orjson.dumps(parsed, option=orjson.OPT_INDENT_2).decode()
+        console.print(Markdown(content))
+    else:
+        console.print(Markdown(str(parsed)))
 
 
 def handle_get_response(command: str):
     """Send a GET request and print response in markdown block."""
-    url = f"{API_URL}{command}"
-    headers = get_auth_headers()
+    if command in _get_cache:
+        print_get_payload(_get_cache[command])
+        return
     try:
-        response = httpx.get(url, headers=headers)
+        response = _SYNC.get(command)
         if response.status_code == 200:
             try:
                 parsed = response.json()
-                # If /help returns a markdown table in 'help'
-                if isinstance(parsed, dict):
-                    content = parsed.get("help", json.dumps(parsed, indent=2))
-                    console.print(Markdown(content))
-                else:
-                    console.print(Markdown(str(parsed)))
+                if command in CACHED_GET_COMMANDS:
+                    _get_cache[command] = parsed
+                print_get_payload(parsed)
             except Exception:
                 console.print(f"[red]✘ Failed to parse response[/red]\n{response.text}")
         else:
@@ -158,55 +422,222 @@ def handle_get_response(command: str):
         console.print(f"[red]✘ GET request failed: {e}[/red]")
 
 
+# A ``` or ~~~ fence line, and a line that may continue the block above a
+# blank line (indented content or another list item).
+_FENCE = re.compile(r" {0,3}(`{3,}|~{3,})")
+_CONTINUATION = re.compile(r"[ \t]|[-*+][ \t]|[0-9]{1,9}[.)][ \t]")
+
+
+def split_stable_markdown(text: str):
+    """Split text after the last blank line that ends a top-level block.
+
+    Blank lines inside a ``` / ~~~ fence or a $$ block do not count, nor do
+    ones followed by an indented line or a list item, which may continue the
+    block above. Only complete lines are considered.
+
+    Returns ``(stable, tail)`` with ``stable + tail == text``; ``stable`` is
+    empty when nothing can be frozen.
+    """
+    split = 0
+    pos = 0
+    fence = None
+    math = False
+    blank_at = None
+    seen_content = False
+    for line in text.splitlines(keepends=True):
+        if not line.endswith("\n"):
+            break
+        start, pos = pos, pos + len(line)
+        if fence:
+            m = _FENCE.match(line)
+            if (
+                m
+                and m.group(1)[0] == fence[0]
+                and len(m.group(1)) >= len(fence)
+                and not line[m.end() :].strip()
+            ):
+                fence = None
+            continue
+        if not line.strip():
+            if seen_content and not math and blank_at is None:
+                blank_at = start
+            continue
+        if blank_at is not None and not _CONTINUATION.match(line):
+            split = start
+        blank_at = None
+        seen_content = True
+        m = _FENCE.match(line)
+        if m:
+            fence = m.group(1)
+        elif line.count("$$") % 2:
+            math = not math
+    return text[:split], text[split:]
+
+
+class FrozenMarkdown:
+    """A finished markdown block, laid out once per width and then replayed.
+
+    Live redraws the whole view on every refresh; without this, every frozen
+    block would be re-highlighted and re-wrapped on each redraw.
+    """
+
+    def __init__(self, markup: str):
+        from rich.markdown import Markdown
+
+        self.markdown = Markdown(markup)
+        self._width = None
+        self._lines = []
+
+    def __rich_console__(self, console, options):
+        if options.max_width != self._width:
+            self._lines = console.render_lines(
+                self.markdown, options.update(height=None), pad=False
+            )
+            self._width = options.max_width
+        new_line = Segment.line()
+        for line in self._lines:
+            yield from line
+            yield new_line
+        yield new_line  # blank line between blocks, as within one Markdown
+
+
+def parse_data_frame(buffer: bytearray, end: int):
+    """Decode the JSON of a ``data:`` event ending at ``end``, or return None."""
+    global _bad_frame_reported
+    if not buffer.startswith(_DATA, 0, end):
+        return None
+    # Parse straight out of the receive buffer; the view must be released
+    # before the caller trims the bytearray.
+    view = memoryview(buffer)[_DATA_LEN:end]
+    try:
+        return orjson.loads(view)  # skips the optional space after "data:"
+    except orjson.JSONDecodeError as e:
+        # Frames are only parsed once their terminator has arrived, so this is
+        # a server bug rather than a partial read; report it once and move on.
+        if not _bad_frame_reported:
+            console.log(f"[yellow]⚠ Skipping malformed SSE frame: {e}[/yellow]")
+            _bad_frame_reported = True
+        return None
+    finally:
+        view.release()
+
+
+async def iter_sse_payloads(response):
+    """Yield the decoded JSON payload of each ``data:`` event in the stream."""
+    # Frame events on raw bytes; `scan` resumes the delimiter search where the
+    # previous chunk left off.
+    buffer = bytearray()
+    scan = 0
+    async for chunk in response.aiter_bytes():
+        buffer += chunk
+        while True:
+            idx = buffer.find(_EVENT_END, scan)
+            if idx < 0:
+                scan = max(0, len(buffer) - 1)
+                break
+            payload = parse_data_frame(buffer, idx)
+            del buffer[: idx + _EVENT_END_LEN]
+            scan = 0
+            if payload is not None:
+                yield payload
+
+
 async def handle_post_stream(prompt: str, command: str):
     """Send a POST request and stream response from the server as markdown."""
-    global last_interaction
-    url = f"{API_URL}{command}"
-    headers = {"Accept": "text/event-stream", **get_auth_headers()}
+    from rich.live import Live
+    from rich.markdown import Markdown
+
+    # Compressed SSE is buffered by the encoder and has to be inflated chunk by
+    # chunk here, so ask for the stream uncompressed.
+    headers = {"Accept": "text/event-stream", "Accept-Encoding": "identity"}
     data = {"prompt": prompt}
-    text_accum = ""
+    # While streaming, completed markdown blocks are rendered once and frozen,
+    # and the unfinished tail is shown as plain text, so partial code blocks
+    # are not re-lexed on every redraw. Once the reply ends, the preview is
+    # replaced by one Markdown of the full text. Tail chunks are joined only
+    # when rendering, and the Group is shared with Live and mutated in place;
+    # its last item is the tail.
+    view = Group(Text(""))
+    frozen_text = []
+    tail_chunks = []
+    rendered_tail = ""
     is_first_chunk = True
+    dirty = asyncio.Event()
+
+    def render(live):
+        nonlocal tail_chunks, rendered_tail
+        stable, tail = split_stable_markdown("".join(tail_chunks))
+        tail_chunks = [tail]
+        parts = view.renderables
+        if stable:
+            frozen_text.append(stable)
+            parts[-1:] = [FrozenMarkdown(stable), Text(tail)]
+        elif tail != rendered_tail:
+            parts[-1] = Text(tail)
+        rendered_tail = tail
+        live.refresh()
+
+    def render_final(live):
+        # Parsing the whole reply once keeps lists and fences that span frozen
+        # blocks exactly as a single Markdown would draw them.
+        text = "".join(frozen_text) + "".join(tail_chunks)
+        view.renderables[:] = [Markdown(text)]
+        live.refresh()
+
+    async def paint(live):
+        # Redraws run off the read loop: the reader only marks the view dirty,
+        # and text that arrives between frames is coalesced into the next one.
+        while True:
+            await dirty.wait()
+            dirty.clear()
+            render(live)
+            await asyncio.sleep(RENDER_INTERVAL)
 
     try:
-        async with httpx.AsyncClient() as client:
-            async with client.stream(
-                "POST", url, headers=headers, json=data, timeout=None
-            ) as response:
-                if response.status_code != 200:
-                    console.print(f"[red]✘ Error:[/red] {await response.aread()}")
-                    return
-
-                with Live(Markdown(""), refresh_per_second=20, console=console) as live:
-                    buffer = ""
-                    async for chunk in response.aiter_text():
-                        buffer += chunk
-                        while "\n\n" in buffer:
-                            block, buffer = buffer.split("\n\n", 1)
-                            if block.startswith("data:"):
-                                try:
-                                    payload = json.loads(block[len("data:") :])
-                                    decoded = payload.get("text", "")
-                                    if isinstance(decoded, list):
-                                        decoded = "".join(decoded)
-                                    if decoded.strip() == "[DONE]":
-                                        live.update(Markdown(text_accum))
-                                        last_interaction = time.time()
-                                        return
-                                    if is_first_chunk:
-                                        decoded = decoded.lstrip()
-                                        is_first_chunk = False
-                                    text_accum += decoded
-                                    live.update(Markdown(text_accum))
-                                except json.JSONDecodeError:
-                                    continue
+        client = get_async_client()
+        async with client.stream(
+            "POST", command, headers=headers, json=data
+        ) as response:
+            if response.status_code != 200:
+                console.print(f"[red]✘ Error:[/red] {await response.aread()}")
+                return
+
+            with Live(view, auto_refresh=False, console=console) as live:
+                painter = asyncio.create_task(paint(live))
+                try:
+                    async for payload in iter_sse_payloads(response):
+                        decoded = payload.get("text", "")
+                        # The server normally sends a str; older builds send a
+                        # list of pieces.
+                        if type(decoded) is list:
+                            decoded = "".join(decoded)
+                        # The server ends a stream with a "[DONE]" text payload,
+                        # possibly padded with whitespace; the substring test
+                        # keeps strip() off the per-token path.
+                        if _DONE in decoded and decoded.strip() == _DONE:
+                            render_final(live)
+                            note_interaction()
+                            return
+                        if is_first_chunk:
+                            decoded = decoded.lstrip()
+                            is_first_chunk = False
+                        tail_chunks.append(decoded)
+                        # Whitespace-only deltas do not change the rendered
+                        # output; let the next visible token mark it dirty.
+                        if decoded and not decoded.isspace():
+                            dirty.set()
+                    # Stream closed without [DONE]; show whatever arrived.
+                    render_final(live)
+                finally:
+                    painter.cancel()
     except Exception as e:
         console.print(f"[red]✘ Stream failed:[/red] {e}")
 
 
-def session_action(endpoint: str):
+async def session_action(endpoint: str):
     """Utility for handling session endpoint responses."""
     try:
-        response = httpx.post(f"{API_URL}{endpoint}", headers=get_auth_headers())
+        response = await get_async_client().post(endpoint, timeout=10)
         msg = response.json().get("message", response.text)
         if response.status_code == 200:
             console.print(f"[green]✔ {msg}[/green]")
@@ -216,35 +647,103 @@ def session_action(endpoint: str):
         console.print(f"[red]✘ Session request failed: {e}[/red]")
 
 
-def main():
+async def session_actions(*endpoints: str):
+    """Run session requests one after another, in the order given.
+
+    Session endpoints change server-side state, so each waits for the one
+    before it; they still share one pooled connection.
+    """
+    for endpoint in endpoints:
+        await session_action(endpoint)
+
+
+# Commands answered by a plain GET and rendered once.
+GET_COMMANDS = frozenset(
+    {"/help", "/filetypes", "/convo/list", "/model/get", "/model/list"}
+)
+# Commands handled locally; each receives the text after the command name.
+COMMANDS = {
+    "/upload": lambda rest: handle_upload(*rest.split()[:2]),
+    "/read": lambda rest: handle_read(rest.split()[0]),
+}
+# Commands that run several session endpoints in sequence: /session/sync dumps
+# the session, then merges it.
+SESSION_BATCHES = {"/session/sync": ("/session/dump", "/session/merge")}
+
+
+async def ask_user(prompt: str) -> str:
+    """Read a line on a daemon thread so the event loop keeps running while idle.
+
+    asyncio.to_thread would leave a blocked input() in the default executor,
+    which asyncio.run waits on at shutdown, so Ctrl-C would hang until Enter.
+    Rich's Console serialises writes with its own lock, so keep-alive warnings
+    printed from the loop meanwhile need no extra locking.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def resolve(setter, value):
+        if not future.done():
+            setter(value)
+
+    def worker():
+        try:
+            result = Prompt.ask(prompt)
+        except BaseException as e:
+            loop.call_soon_threadsafe(resolve, future.set_exception, e)
+        else:
+            loop.call_soon_threadsafe(resolve, future.set_result, result)
+
+    threading.Thread(target=worker, daemon=True).start()
+    return await future
+
+
+async def main():
     """Interactive command-line client loop."""
     console.print("[bold green]Local LLM Client[/bold green] 🧠")
     console.print(
-        "Type [bold]/exit[/bold] to quit. Use [bold]/upload <path>[/bold], etc."
+        "Type [bold]/exit[/bold] to quit. Use [bold]/upload <path>[/bold],"
+        " [bold]/session/sync[/bold] (dump, then merge), etc."
     )
-    while True:
-        user_input = Prompt.ask("[yellow]You[/yellow]")
-        if user_input.strip() == "/exit":
-            break
-        elif user_input.startswith("/upload "):
-            parts = user_input.split()
-            handle_upload(parts[1], parts[2] if len(parts) > 2 else None)
-        elif user_input.startswith("/read "):
-            handle_read(user_input.split()[1])
-        elif user_input.startswith("/"):
-            if user_input in [
-                "/help",
-                "/filetypes",
-                "/convo/list",
-                "/model/get",
-                "/model/list",
-            ]:
-                handle_get_response(user_input)
+    # The whole session runs on this one event loop, so the async connection
+    # pool survives between prompts and keep-alive pings run while idle.
+    keep_alive_task = asyncio.create_task(keep_alive())
+    # The sync client is already warm from /connect; do the same for streaming
+    # while the user types.
+    warm_up_task = asyncio.create_task(warm_up_async_client())
+    try:
+        while True:
+            user_input = await ask_user("[yellow]You[/yellow]")
+            cmd, _, rest = user_input.strip().partition(" ")
+            handler = COMMANDS.get(cmd)
+            if cmd == "/exit" and not rest:
+                break
+            elif handler and rest:
+                handler(rest)
+            elif cmd in GET_COMMANDS and not rest:
+                handle_get_response(cmd)
+            elif cmd in SESSION_BATCHES and not rest:
+                await session_actions(*SESSION_BATCHES[cmd])
+            elif user_input.startswith("/"):
+                await handle_post_stream("", user_input)
             else:
-                asyncio.run(handle_post_stream("", user_input))
-        else:
-            asyncio.run(handle_post_stream(user_input, "/stream"))
+                await handle_post_stream(user_input, "/stream")
+    finally:
+        keep_alive_task.cancel()
+        warm_up_task.cancel()
+        await close_async_client()
 
 
 if __name__ == "__main__":
-    main()
+    client_config = load_client_config()
+    current_jwt()  # surface key errors before connecting
+    connect_and_get_session()
+    # uvloop's libuv loop cuts per-callback overhead on the many small SSE and
+    # HTTP/2 frames; it has no Windows build, so fall back to asyncio there.
+    # uvloop.run needs uvloop 0.18 or newer (see requirements.txt).
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
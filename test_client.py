@@ -0,0 +1,42 @@
+import pytest
+
+from client import parse_flat_yaml
+
+yaml = pytest.importorskip("yaml")
+
+# Each input is either parsed exactly as yaml.safe_load would, or rejected
+# (None) so load_client_config falls back to PyYAML.
+FLAT_YAML_CASES = [
+    "username: alice\nsecret: ~/.ssh/karllm.pem\n",
+    "# comment\n---\nusername: alice\n\nsaveInteractions: true\n",
+    "a: true\nb: True\nc: TRUE\nd: tRue\n",
+    "a: yes\nb: Yes\nc: YES\nd: yEs\n",
+    "a: on\nb: Off\nc: NO\nd: oN\n",
+    "a: null\nb: Null\nc: NULL\nd: nUll\ne: ~\n",
+    "username: nUll\nsecret: key.pem\n",
+    "a: 0\nb: 42\nc: 010\nd: 0x10\ne: -1\nf: 1.5\n",
+    "a: 'quoted: yes'\nb: \"true\"\nc: 'it''s'\n",
+    "a: b: c\n",
+    "a: value # comment\n",
+    "a:\n  b: c\n",
+    "a: [1, 2]\nb: {c: d}\n",
+    "a: |\n  text\n",
+    "a: &anchor x\nb: *anchor\n",
+    "true: x\n",
+    "tRue: x\n",
+    "path: /home/alice/.config\nurl: https://example.com:8443\n",
+]
+
+
+@pytest.mark.parametrize("text", FLAT_YAML_CASES)
+def test_parse_flat_yaml_matches_pyyaml(text):
+    parsed = parse_flat_yaml(text)
+    if parsed is not None:
+        assert parsed == yaml.safe_load(text)
+
+
+def test_parse_flat_yaml_keeps_mixed_case_words_as_strings():
+    assert parse_flat_yaml("username: nUll\nsecret: key.pem\n") == {
+        "username": "nUll",
+        "secret": "key.pem",
+    }